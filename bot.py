@@ -11,15 +11,15 @@ if __name__ == "__main__" and "bot.py" in sys.argv[0]:
 # ========================================================
 
 # ============ ПРОВЕРКА ФАЙЛОВ СЕССИИ ============
-print("🔍 CHECKING SESSION FILES ON RENDER")
-print("=" * 50)
-
-# Текущая директория
-current_dir = os.getcwd()
-print(f"Current directory: {current_dir}")
-
 # Функция для поиска файла сессии
 def find_session_file():
+    print("🔍 CHECKING SESSION FILES ON RENDER")
+    print("=" * 50)
+
+    # Текущая директория
+    current_dir = os.getcwd()
+    print(f"Current directory: {current_dir}")
+
     possible_paths = [
         'user_session.session',
         './user_session.session',
@@ -39,11 +39,6 @@ def find_session_file():
     
     print("❌ NO SESSION FILES FOUND!")
     return 'user_session'  # fallback
-
-# Находим файл сессии
-session_path = find_session_file()
-print(f"📁 Using session path: {session_path}")
-print("=" * 50)
 # ============ КОНЕЦ ПРОВЕРКИ ============
 
 # ТВОЙ ОРИГИНАЛЬНЫЙ КОД НИЖЕ (НЕ МЕНЯТЬ!)
@@ -51,30 +46,26 @@ import asyncio
 import json
 import logging
 import re
+import time
+import signal
 from datetime import datetime
 from telethon import TelegramClient
+from telethon.errors import ChannelPrivateError, ChatWriteForbiddenError, UserBannedInChannelError, FloodWaitError
+from telethon.tl.types import ChatForbidden, ChannelForbidden
 from aiogram import Bot, Dispatcher, types, F
 from aiogram.filters import Command
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.storage.memory import MemoryStorage
-from config import Config
+from config import Config, load_tenant_configs
+from stats import MailingStats
+from lease import Lease
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Initialize clients with found session path
-client = TelegramClient(session_path, Config.API_ID, Config.API_HASH)
-bot = Bot(token=Config.BOT_TOKEN)
-storage = MemoryStorage()
-dp = Dispatcher(storage=storage)
-
-# Storage files
-GROUPS_FILE = Config.GROUPS_FILE
-SETTINGS_FILE = 'bot_settings.json'
-
 # States
 class BotStates(StatesGroup):
     waiting_for_group = State()
@@ -83,62 +74,85 @@ class BotStates(StatesGroup):
     waiting_for_tag_user = State()
 
 # Load data functions
-def load_groups():
-    if os.path.exists(GROUPS_FILE):
+def load_groups(groups_file):
+    if os.path.exists(groups_file):
         try:
-            with open(GROUPS_FILE, 'r') as f:
+            with open(groups_file, 'r') as f:
                 return json.load(f)
         except:
             return []
     return []
 
-def load_settings():
-    if os.path.exists(SETTINGS_FILE):
+def load_settings(settings_file):
+    if os.path.exists(settings_file):
         try:
-            with open(SETTINGS_FILE, 'r') as f:
+            with open(settings_file, 'r') as f:
                 return json.load(f)
         except:
             return {
-                "mailing_enabled": False, 
-                "delay_seconds": 60, 
+                "mailing_enabled": False,
+                "delay_seconds": 60,
                 "simultaneous_sending": True,
                 "auto_repeat": False,
                 "repeat_count": 0,
                 "max_repeats": 10
             }
     return {
-        "mailing_enabled": False, 
-        "delay_seconds": 60, 
+        "mailing_enabled": False,
+        "delay_seconds": 60,
         "simultaneous_sending": True,
         "auto_repeat": False,
         "repeat_count": 0,
         "max_repeats": 10
     }
 
-def save_groups(groups):
+def save_groups(groups_file, groups):
     try:
-        with open(GROUPS_FILE, 'w') as f:
+        with open(groups_file, 'w') as f:
             json.dump(groups, f)
     except Exception as e:
         logger.error(f"Error saving groups: {e}")
 
-def save_settings(settings):
+def save_settings(settings_file, settings):
     try:
-        with open(SETTINGS_FILE, 'w') as f:
+        with open(settings_file, 'w') as f:
             json.dump(settings, f)
     except Exception as e:
         logger.error(f"Error saving settings: {e}")
 
-# Global variables
-groups = load_groups()
-bot_settings = load_settings()
-pending_message = None
-is_mailing_active = False
-mailing_task = None
+# Состояние одной пары бот/аккаунт
+class Tenant:
+    def __init__(self, config):
+        self.name = config.name
+        self.config = config
+        self.client = TelegramClient(config.SESSION, config.API_ID, config.API_HASH)
+        self.bot = Bot(token=config.BOT_TOKEN)
+        # Tenant передается в хендлеры через workflow data диспетчера
+        self.dp = Dispatcher(storage=MemoryStorage(), tenant=self)
+
+        self.groups = load_groups(config.GROUPS_FILE)
+        self.bot_settings = load_settings(config.SETTINGS_FILE)
+        self.pending_message = None
+        self.is_mailing_active = False
+        self.mailing_task = None
+        self.refresh_task = None
+        self.stats = MailingStats()
+
+    def save_groups(self):
+        save_groups(self.config.GROUPS_FILE, self.groups)
+
+    def save_settings(self):
+        save_settings(self.config.SETTINGS_FILE, self.bot_settings)
+
+def create_app(config):
+    """Application factory: создает tenant со своими клиентами и хендлерами"""
+    tenant = Tenant(config)
+    register_handlers(tenant.dp)
+    return tenant
 
 # Keyboard layouts - UKRAINIAN
-def get_main_keyboard():
-    mailing_status = "🟢 Запустити розсилку" if not is_mailing_active else "🔴 Зупинити розсилку"
+def get_main_keyboard(tenant):
+    mailing_status = "🟢 Запустити розсилку" if not tenant.is_mailing_active else "🔴 Зупинити розсилку"
     return ReplyKeyboardMarkup(
         keyboard=[
             [KeyboardButton(text="📋 Переглянути групи"), KeyboardButton(text="➕ Додати групу")],
@@ -166,19 +180,18 @@ def get_compose_keyboard():
     )
 
 # Bot command handlers - UKRAINIAN
-@dp.message(Command("start"))
-async def start_command(message: types.Message):
-    if message.from_user.id != Config.ADMIN_ID:
+async def start_command(message: types.Message, tenant: Tenant):
+    if message.from_user.id != tenant.config.ADMIN_ID:
         await message.answer("❌ Неавторизований доступ. Цей бот приватний.")
         return
-    
+
     welcome_text = """
 🤖 **Персональний Telegram Бот для Розсилки**
 
 Я відправляю ваші повідомлення в групи з вашего ОСОБИСТОГО акаунту.
 
 **✨ Основні функції:**
-• Ручне створення та відправка повідомлень  
+• Ручне створення та відправка повідомлень
 • Автоматична розсилка з затримкою
 • Підтримка текстів та фото (відразу видно)
 • Одночасна відправка в усі групи
@@ -193,22 +206,24 @@ async def start_command(message: types.Message):
 
 Використовуйте кнопки нижче, щоб почати!
     """
-    await message.answer(welcome_text, reply_markup=get_main_keyboard(), parse_mode='Markdown')
+    await message.answer(welcome_text, reply_markup=get_main_keyboard(tenant), parse_mode='Markdown')
 
-@dp.message(F.text == "📋 Переглянути групи")
-async def view_groups(message: types.Message):
-    if not groups:
+async def view_groups(message: types.Message, tenant: Tenant):
+    if not tenant.groups:
         await message.answer("❌ Групи ще не додані. Використовуйте '➕ Додати групу' щоб додати першу групу.")
         return
-    
+
     groups_text = "📋 **Ваші групи:**\n\n"
-    for i, group in enumerate(groups, 1):
-        groups_text += f"{i}. {group['title']}\n   ID: `{group['id']}`\n\n"
-    
-    groups_text += f"**Всього:** {len(groups)} груп"
+    for i, group in enumerate(tenant.groups, 1):
+        flag = " 🚫" if not group.get('can_post', True) else ""
+        groups_text += f"{i}. {group['title']}{flag}\n   ID: `{group['id']}`\n\n"
+
+    groups_text += f"**Всього:** {len(tenant.groups)} груп"
+    blocked_count = len(tenant.groups) - len(sendable_groups(tenant))
+    if blocked_count:
+        groups_text += f"\n🚫 Без права писати (пропускаються): {blocked_count}"
     await message.answer(groups_text, parse_mode='Markdown')
 
-@dp.message(F.text == "➕ Додати групу")
 async def add_group_start(message: types.Message, state: FSMContext):
     await state.set_state(BotStates.waiting_for_group)
     await message.answer(
@@ -222,82 +237,78 @@ async def add_group_start(message: types.Message, state: FSMContext):
         parse_mode='Markdown'
     )
 
-@dp.message(BotStates.waiting_for_group)
-async def add_group_process(message: types.Message, state: FSMContext):
+async def add_group_process(message: types.Message, state: FSMContext, tenant: Tenant):
     if message.text == "❌ Скасувати":
         await state.clear()
-        await message.answer("❌ Скасовано.", reply_markup=get_main_keyboard())
+        await message.answer("❌ Скасовано.", reply_markup=get_main_keyboard(tenant))
         return
-    
+
     try:
         group_input = message.text.strip()
-        
+
         # Try to get entity by username or invite link
         if 't.me/' in group_input:
             # Extract username from link
             username = group_input.split('t.me/')[-1].split('/')[-1]
             if '+' in username:
                 username = username.replace('+', '')
-            entity = await client.get_entity(username)
+            entity = await tenant.client.get_entity(username)
         else:
             # Try as group ID
-            entity = await client.get_entity(int(group_input))
-        
+            entity = await tenant.client.get_entity(int(group_input))
+
         group_info = {
             'id': entity.id,
             'title': entity.title,
             'username': getattr(entity, 'username', None)
         }
-        
+
         # Check if group already exists
-        if any(g['id'] == group_info['id'] for g in groups):
+        if any(g['id'] == group_info['id'] for g in tenant.groups):
             await message.answer("❌ Ця група вже є у вашому списку.")
         else:
-            groups.append(group_info)
-            save_groups(groups)
-            await message.answer(f"✅ **Групу успішно додано!**\n\n**Назва:** {entity.title}\n**ID:** `{entity.id}`", 
-                               reply_markup=get_main_keyboard(), parse_mode='Markdown')
-        
+            tenant.groups.append(group_info)
+            tenant.save_groups()
+            await message.answer(f"✅ **Групу успішно додано!**\n\n**Назва:** {entity.title}\n**ID:** `{entity.id}`",
+                               reply_markup=get_main_keyboard(tenant), parse_mode='Markdown')
+
         await state.clear()
-        
+
     except Exception as e:
         await message.answer(f"❌ Помилка: Не вдалося знайти групу. Будь ласка, перевірте посилання/ID та спробуйте ще раз.\n\nПомилка: {str(e)}")
 
-@dp.message(F.text == "🗑 Видалити групу")
-async def remove_group_start(message: types.Message):
-    if not groups:
+async def remove_group_start(message: types.Message, tenant: Tenant):
+    if not tenant.groups:
         await message.answer("❌ Немає груп для видалення.")
         return
-    
+
     keyboard = ReplyKeyboardMarkup(resize_keyboard=True)
-    for group in groups:
+    for group in tenant.groups:
         keyboard.add(KeyboardButton(f"🗑 {group['title']}"))
     keyboard.add(KeyboardButton("❌ Скасувати"))
-    
+
     await message.answer("Виберіть групу для видалення:", reply_markup=keyboard)
 
-@dp.message(F.text.startswith("🗑 "))
-async def remove_group_action(message: types.Message):
+async def remove_group_action(message: types.Message, tenant: Tenant):
     if message.text == "❌ Скасувати":
-        await message.answer("❌ Скасовано.", reply_markup=get_main_keyboard())
+        await message.answer("❌ Скасовано.", reply_markup=get_main_keyboard(tenant))
         return
-    
+
     group_title = message.text.replace("🗑 ", "")
-    global groups
-    initial_count = len(groups)
-    groups = [g for g in groups if g['title'] != group_title]
-    
-    if len(groups) < initial_count:
-        save_groups(groups)
-        await message.answer(f"✅ Групу '{group_title}' успішно видалено!", reply_markup=get_main_keyboard())
+    initial_count = len(tenant.groups)
+    tenant.groups = [g for g in tenant.groups if g['title'] != group_title]
+
+    if len(tenant.groups) < initial_count:
+        tenant.save_groups()
+        tenant.stats.forget({g['id'] for g in tenant.groups})
+        await message.answer(f"✅ Групу '{group_title}' успішно видалено!", reply_markup=get_main_keyboard(tenant))
     else:
-        await message.answer("❌ Групу не знайдено.", reply_markup=get_main_keyboard())
+        await message.answer("❌ Групу не знайдено.", reply_markup=get_main_keyboard(tenant))
 
-@dp.message(F.text == "⏰ Затримка")
-async def change_delay_start(message: types.Message, state: FSMContext):
+async def change_delay_start(message: types.Message, state: FSMContext, tenant: Tenant):
     await state.set_state(BotStates.waiting_for_delay)
     await message.answer(
-        f"⏰ Поточна затримка: {bot_settings['delay_seconds']} секунд\n\n"
+        f"⏰ Поточна затримка: {tenant.bot_settings['delay_seconds']} секунд\n\n"
         "Введіть нову затримку в секундах між повідомленнями:\n"
         "60 = 1 хвилина\n"
         "120 = 2 хвилини\n"
@@ -306,32 +317,30 @@ async def change_delay_start(message: types.Message, state: FSMContext):
         reply_markup=get_cancel_keyboard()
     )
 
-@dp.message(BotStates.waiting_for_delay)
-async def change_delay_process(message: types.Message, state: FSMContext):
+async def change_delay_process(message: types.Message, state: FSMContext, tenant: Tenant):
     if message.text == "❌ Скасувати":
         await state.clear()
-        await message.answer("❌ Скасовано.", reply_markup=get_main_keyboard())
+        await message.answer("❌ Скасовано.", reply_markup=get_main_keyboard(tenant))
         return
-    
+
     try:
         delay = int(message.text)
         if 1 <= delay <= 3600:  # Up to 1 hour
-            bot_settings['delay_seconds'] = delay
-            save_settings(bot_settings)
+            tenant.bot_settings['delay_seconds'] = delay
+            tenant.save_settings()
             minutes = delay // 60
             seconds = delay % 60
             time_text = f"{minutes} хв {seconds} сек" if minutes > 0 else f"{delay} сек"
-            await message.answer(f"✅ Затримку встановлено на {time_text}!", reply_markup=get_main_keyboard())
+            await message.answer(f"✅ Затримку встановлено на {time_text}!", reply_markup=get_main_keyboard(tenant))
         else:
             await message.answer("❌ Будь ласка, введіть число від 1 до 3600 секунд (1 година).")
             return
     except ValueError:
         await message.answer("❌ Будь ласка, введіть коректне число.")
         return
-    
+
     await state.clear()
 
-@dp.message(F.text == "✏️ Створити повідомлення")
 async def compose_message_start(message: types.Message, state: FSMContext):
     await state.set_state(BotStates.waiting_for_message)
     await message.answer(
@@ -346,24 +355,21 @@ async def compose_message_start(message: types.Message, state: FSMContext):
     )
 
 # Handle text messages
-@dp.message(BotStates.waiting_for_message, F.text)
-async def compose_text_process(message: types.Message, state: FSMContext):
-    global pending_message
-    
+async def compose_text_process(message: types.Message, state: FSMContext, tenant: Tenant):
     if message.text == "❌ Скасувати":
         await state.clear()
-        await message.answer("❌ Скасовано.", reply_markup=get_main_keyboard())
+        await message.answer("❌ Скасовано.", reply_markup=get_main_keyboard(tenant))
         return
-    
+
     # Store the composed message
-    pending_message = {
+    tenant.pending_message = {
         'text': message.text,
         'media': None,
         'message_type': 'text'
     }
-    
-    logger.info(f"Text message saved: {pending_message['text'][:50]}...")
-    
+
+    logger.info(f"[{tenant.name}] Text message saved: {tenant.pending_message['text'][:50]}...")
+
     # Ask what to do next
     await message.answer(
         "✅ Текстове повідомлення створено!\n\n"
@@ -373,26 +379,23 @@ async def compose_text_process(message: types.Message, state: FSMContext):
     await state.clear()
 
 # Handle photo messages
-@dp.message(BotStates.waiting_for_message, F.photo)
-async def compose_photo_process(message: types.Message, state: FSMContext):
-    global pending_message
-    
+async def compose_photo_process(message: types.Message, state: FSMContext, tenant: Tenant):
     try:
         # Download and store the photo properly
-        file_info = await bot.get_file(message.photo[-1].file_id)
-        downloaded_file = await bot.download_file(file_info.file_path)
+        file_info = await tenant.bot.get_file(message.photo[-1].file_id)
+        downloaded_file = await tenant.bot.download_file(file_info.file_path)
         photo_data = downloaded_file.read()
-        
+
         # Store everything needed for proper photo sending
-        pending_message = {
+        tenant.pending_message = {
             'text': message.caption or "",
             'photo_data': photo_data,
             'message_type': 'photo',
             'file_extension': 'jpg'
         }
-        
-        logger.info(f"Photo message saved. Caption: '{pending_message['text']}', Size: {len(photo_data)} bytes")
-        
+
+        logger.info(f"[{tenant.name}] Photo message saved. Caption: '{tenant.pending_message['text']}', Size: {len(photo_data)} bytes")
+
         # Ask what to do next
         await message.answer(
             "✅ Фото з підписом створено!\n\n"
@@ -400,13 +403,12 @@ async def compose_photo_process(message: types.Message, state: FSMContext):
             reply_markup=get_compose_keyboard()
         )
         await state.clear()
-        
+
     except Exception as e:
-        logger.error(f"Error processing photo: {e}")
+        logger.error(f"[{tenant.name}] Error processing photo: {e}")
         await message.answer("❌ Помилка при обробці фото. Спробуйте ще раз.")
         await state.clear()
 
-@dp.message(F.text == "✅ Додати теги")
 async def add_tags_start(message: types.Message, state: FSMContext):
     await state.set_state(BotStates.waiting_for_tag_user)
     await message.answer(
@@ -419,221 +421,443 @@ async def add_tags_start(message: types.Message, state: FSMContext):
         reply_markup=get_cancel_keyboard()
     )
 
-@dp.message(BotStates.waiting_for_tag_user)
-async def add_tags_process(message: types.Message, state: FSMContext):
+async def add_tags_process(message: types.Message, state: FSMContext, tenant: Tenant):
     if message.text == "❌ Скасувати":
         await state.clear()
-        await message.answer("❌ Скасовано.", reply_markup=get_main_keyboard())
+        await message.answer("❌ Скасовано.", reply_markup=get_main_keyboard(tenant))
         return
-    
+
     if message.text.lower() == 'готово':
         await state.clear()
-        await send_composed_message(message)
+        await send_composed_message(message, tenant)
         return
-    
+
     # Process usernames
     usernames = [line.strip() for line in message.text.split('\n') if line.strip()]
     tags_text = "\n".join([f"@{username}" for username in usernames])
-    
+
+    pending_message = tenant.pending_message
     if pending_message:
         if pending_message['text']:
             pending_message['text'] = f"{pending_message['text']}\n\n{tags_text}"
         else:
             pending_message['text'] = tags_text
-    
+
     await message.answer(
         f"✅ Теги додано! Поточне повідомлення:\n\n{pending_message['text']}\n\n"
         "Надішліть ще імена користувачів або напишіть 'готово' щоб відправити повідомлення.",
         reply_markup=get_cancel_keyboard()
     )
 
-@dp.message(F.text == "📤 Надіслати 1 раз")
-async def send_once_handler(message: types.Message):
-    await send_composed_message(message)
+async def send_once_handler(message: types.Message, tenant: Tenant):
+    await send_composed_message(message, tenant)
 
-@dp.message(F.text == "🔄 Авто-повтор")
-async def auto_repeat_handler(message: types.Message):
-    if not pending_message:
-        await message.answer("❌ Спочатку створіть повідомлення.", reply_markup=get_main_keyboard())
+async def auto_repeat_handler(message: types.Message, tenant: Tenant):
+    if not tenant.pending_message:
+        await message.answer("❌ Спочатку створіть повідомлення.", reply_markup=get_main_keyboard(tenant))
         return
-    
-    bot_settings['auto_repeat'] = True
-    save_settings(bot_settings)
-    await message.answer("🔄 Авто-повтор увімкнено! Запустіть розсилку для початку.", reply_markup=get_main_keyboard())
 
-async def send_composed_message(message: types.Message):
-    global pending_message
-    
-    if not pending_message:
-        await message.answer("❌ Немає повідомлення для відправки. Спочатку створіть повідомлення.", reply_markup=get_main_keyboard())
+    tenant.bot_settings['auto_repeat'] = True
+    tenant.save_settings()
+    await message.answer("🔄 Авто-повтор увімкнено! Запустіть розсилку для початку.", reply_markup=get_main_keyboard(tenant))
+
+async def send_composed_message(message: types.Message, tenant: Tenant):
+    if not tenant.pending_message:
+        await message.answer("❌ Немає повідомлення для відправки. Спочатку створіть повідомлення.", reply_markup=get_main_keyboard(tenant))
         return
-    
-    if not groups:
-        await message.answer("❌ Групи не додані. Будь ласка, спочатку додайте групи.", reply_markup=get_main_keyboard())
+
+    if not tenant.groups:
+        await message.answer("❌ Групи не додані. Будь ласка, спочатку додайте групи.", reply_markup=get_main_keyboard(tenant))
         return
-    
-    await send_to_all_groups(message)
 
-async def send_to_all_groups(message: types.Message):
+    if not sendable_groups(tenant):
+        await message.answer("🚫 У всіх групах немає права писати. Перевірте список через '📋 Переглянути групи'.", reply_markup=get_main_keyboard(tenant))
+        return
+
+    await send_to_all_groups(message, tenant)
+
+async def send_to_all_groups(message: types.Message, tenant: Tenant):
     """Send to all groups simultaneously"""
-    await message.answer(f"⚡ Відправляю в {len(groups)} груп...")
-    
-    tasks = []
+    groups = sendable_groups(tenant)
+    status_message = await message.answer(f"⚡ Відправляю в {len(groups)} груп...")
+
+    cycle_started = time.monotonic()
+    tasks = {}
     for group in groups:
-        task = send_to_group(group)
-        tasks.append(task)
-    
-    # Send to all groups simultaneously
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Count results
-    sent_count = sum(1 for result in results if result is True)
-    failed_count = len(groups) - sent_count
-    
+        task = asyncio.create_task(send_to_group(tenant, group))
+        tasks[task] = group
+
+    # Send to all groups simultaneously, consuming results as they complete
+    sent_count = 0
+    failed_count = 0
+    failed_titles = []
+    last_edit = cycle_started
+    pending = set(tasks)
+
+    while pending:
+        # The timeout keeps the progress ticking even when nothing completes (FloodWait)
+        done, pending = await asyncio.wait(pending, timeout=Config.PROGRESS_EDIT_INTERVAL,
+                                           return_when=asyncio.FIRST_COMPLETED)
+        first_failure = False
+        for task in done:
+            if task.result() is True:
+                sent_count += 1
+            else:
+                failed_count += 1
+                failed_titles.append(tasks[task]['title'])
+                first_failure = first_failure or failed_count == 1
+
+        if not pending:
+            break
+
+        # Throttle edits to stay within Bot API limits; the first failure is shown right away
+        now = time.monotonic()
+        if now - last_edit >= Config.PROGRESS_EDIT_INTERVAL or first_failure:
+            last_edit = now
+            eta = estimate_remaining(tenant, [tasks[task] for task in pending], now - cycle_started)
+            await edit_progress(status_message, sent_count, failed_count, len(groups),
+                                now - cycle_started, failed_titles, eta)
+
+    tenant.stats.record_cycle(sent_count, cycle_started)
+    await edit_progress(status_message, sent_count, failed_count, len(groups),
+                        time.monotonic() - cycle_started, failed_titles)
+
     # Update statistics
-    bot_settings['repeat_count'] += 1
-    save_settings(bot_settings)
-    
+    tenant.bot_settings['repeat_count'] += 1
+    tenant.save_settings()
+
     # Final result
     if failed_count == 0:
-        await message.answer(f"✅ Відправлено в {sent_count} груп! (Всього відправок: {bot_settings['repeat_count']})", reply_markup=get_main_keyboard())
+        await message.answer(f"✅ Відправлено в {sent_count} груп! (Всього відправок: {tenant.bot_settings['repeat_count']})", reply_markup=get_main_keyboard(tenant))
     else:
-        await message.answer(f"⚠️ Відправлено в {sent_count} груп, не вдалося в {failed_count} груп (Всього відправок: {bot_settings['repeat_count']})", reply_markup=get_main_keyboard())
+        await message.answer(f"⚠️ Відправлено в {sent_count} груп, не вдалося в {failed_count} груп (Всього відправок: {tenant.bot_settings['repeat_count']})", reply_markup=get_main_keyboard(tenant))
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    minutes = seconds // 60
+    return f"{minutes} хв {seconds % 60} сек" if minutes > 0 else f"{seconds} сек"
+
+def estimate_remaining(tenant, pending_groups, elapsed):
+    """
+    ETA для групп, которые еще отправляются.
+
+    Все отправки идут параллельно, поэтому оценка - это самая долгая
+    ожидаемая (p95 из статистики) отправка минус уже прошедшее время.
+    None, если истории нет или отправки уже идут дольше обычного.
+    """
+    expected = [tenant.stats.groups[g['id']].p95 for g in pending_groups
+                if g['id'] in tenant.stats.groups and len(tenant.stats.groups[g['id']].latency)]
+    if not expected:
+        return None
+    remaining = max(expected) - elapsed
+    return remaining if remaining > 0 else None
 
-async def send_to_group(group):
+def format_progress(sent_count, failed_count, total, elapsed, failed_titles=(), eta=None):
+    """Текст прогресса: отправлено / ошибки / в процессе, время и ETA"""
+    pending_count = total - sent_count - failed_count
+    text = (
+        f"⚡ Відправка в {total} груп\n\n"
+        f"✅ Відправлено: {sent_count}\n"
+        f"❌ Не вдалося: {failed_count}\n"
+        f"⏳ Відправляється: {pending_count}\n"
+        f"⏱ Минуло: {format_duration(elapsed)}"
+    )
+    if eta is not None:
+        text += f"\n🏁 Залишилось ~{format_duration(eta)}"
+    if failed_titles:
+        text += "\n\nПомилки: " + ", ".join(failed_titles[:5])
+        if len(failed_titles) > 5:
+            text += f" (+{len(failed_titles) - 5})"
+    return text
+
+async def edit_progress(status_message, sent_count, failed_count, total, elapsed, failed_titles=(), eta=None):
+    try:
+        await status_message.edit_text(format_progress(sent_count, failed_count, total, elapsed, failed_titles, eta))
+    except Exception as e:
+        # "message is not modified" and edit limits must not break the mailing
+        logger.debug(f"Progress edit skipped: {e}")
+
+async def send_to_group(tenant, group):
     """Send message to a single group"""
+    pending_message = tenant.pending_message
+    started = time.monotonic()
     try:
         if pending_message['message_type'] == 'photo':
             # Save photo to temporary file
-            temp_filename = f"temp_photo_{group['id']}.jpg"
+            temp_filename = f"temp_photo_{tenant.name}_{group['id']}.jpg"
             with open(temp_filename, 'wb') as f:
                 f.write(pending_message['photo_data'])
-            
+
             try:
                 # Send as photo (not document)
                 if pending_message['text']:
-                    await client.send_file(
+                    await tenant.client.send_file(
                         group['id'],
                         temp_filename,
                         caption=pending_message['text'],
                         force_document=False
                     )
                 else:
-                    await client.send_file(
+                    await tenant.client.send_file(
                         group['id'],
                         temp_filename,
                         force_document=False
                     )
-                
+
             finally:
                 # Clean up temp file
                 if os.path.exists(temp_filename):
                     os.remove(temp_filename)
-                    
+
         else:
             # Send text message
-            await client.send_message(group['id'], pending_message['text'])
-        
+            await tenant.client.send_message(group['id'], pending_message['text'])
+
+        tenant.stats.record_send(group['id'], started, True)
         return True
-        
+
     except Exception as e:
-        logger.error(f"❌ Failed to send to {group['title']}: {e}")
+        logger.error(f"[{tenant.name}] ❌ Failed to send to {group['title']}: {e}")
+        tenant.stats.record_send(group['id'], started, False, f"{type(e).__name__}: {e}")
+        if isinstance(e, FORBIDDEN_ERRORS) and group.get('can_post', True):
+            # Следующий цикл не должен тратить запросы на эту группу
+            logger.warning(f"[{tenant.name}] Can no longer post to {group['title']}, skipping it in mailings")
+            group['can_post'] = False
+            tenant.save_groups()
+        return False
+
+def sendable_groups(tenant):
+    """Группы, в которые аккаунт еще может писать"""
+    return [g for g in tenant.groups if g.get('can_post', True)]
+
+def can_post(entity):
+    """Может ли аккаунт отправлять сообщения в чат/канал"""
+    if isinstance(entity, (ChatForbidden, ChannelForbidden)):
+        return False
+    if getattr(entity, 'left', False) or getattr(entity, 'deactivated', False):
         return False
+    if getattr(entity, 'creator', False):
+        return True
+
+    admin_rights = getattr(entity, 'admin_rights', None)
+    if getattr(entity, 'broadcast', False):
+        return bool(admin_rights and admin_rights.post_messages)
+    if admin_rights:
+        return True
+
+    for rights in (getattr(entity, 'banned_rights', None), getattr(entity, 'default_banned_rights', None)):
+        if rights and rights.send_messages:
+            return False
+    return True
+
+# Ошибки, которые точно означают, что писать в группу больше нельзя
+FORBIDDEN_ERRORS = (ChannelPrivateError, ChatWriteForbiddenError, UserBannedInChannelError)
+
+async def resolve_groups(tenant, group_ids):
+    """
+    Одним запросом получает сущности пачки групп, при ошибке - по одной.
+
+    None - доступа к группе точно нет. Группы с временными ошибками
+    (сеть, нет в кэше) в результат не попадают. FloodWaitError
+    пробрасывается: во время FloodWait запросов больше не делаем.
+    """
+    try:
+        entities = await tenant.client.get_entity(group_ids)
+        return dict(zip(group_ids, entities))
+    except FloodWaitError:
+        raise
+    except Exception as e:
+        logger.info(f"[{tenant.name}] Batch resolve failed ({e}), resolving one by one")
+
+    resolved = {}
+    for index, group_id in enumerate(group_ids):
+        if index:
+            await asyncio.sleep(Config.GROUP_REFRESH_PAUSE)
+        try:
+            resolved[group_id] = await tenant.client.get_entity(group_id)
+        except FloodWaitError:
+            raise
+        except FORBIDDEN_ERRORS as e:
+            logger.warning(f"[{tenant.name}] No access to group {group_id}: {e}")
+            resolved[group_id] = None
+        except Exception as e:
+            logger.warning(f"[{tenant.name}] Cannot resolve group {group_id}, keeping its state: {e}")
+    return resolved
+
+async def refresh_groups(tenant):
+    """Обновляет названия, usernames и право писать для всех групп tenant-а"""
+    group_ids = [g['id'] for g in tenant.groups]
+    batch_size = Config.GROUP_REFRESH_BATCH
+    changed = False
+
+    for start in range(0, len(group_ids), batch_size):
+        try:
+            resolved = await resolve_groups(tenant, group_ids[start:start + batch_size])
+        except FloodWaitError as e:
+            # Низкий приоритет: прекращаем этот проход, остальное - в следующий раз
+            logger.warning(f"[{tenant.name}] FloodWait {e.seconds}s while refreshing groups, stopping this pass")
+            break
+
+        # Список мог измениться, пока ждали ответа
+        for group in tenant.groups:
+            if group['id'] not in resolved:
+                continue
+            entity = resolved[group['id']]
+            update = {'can_post': entity is not None and can_post(entity)}
+            if entity is not None and getattr(entity, 'title', None):
+                update['title'] = entity.title
+                update['username'] = getattr(entity, 'username', None)
+
+            if any(group.get(key) != value for key, value in update.items()):
+                if group.get('can_post', True) and not update['can_post']:
+                    logger.warning(f"[{tenant.name}] Can no longer post to {group['title']}, skipping it in mailings")
+                group.update(update)
+                changed = True
+
+        # Низкий приоритет: не забиваем клиент запросами
+        await asyncio.sleep(Config.GROUP_REFRESH_PAUSE)
+
+    if changed:
+        tenant.save_groups()
+    return changed
+
+async def refresh_groups_loop(tenant):
+    """Фоновое обновление метаданных групп: сразу при старте, затем по расписанию"""
+    while True:
+        try:
+            if tenant.groups and await tenant.client.is_user_authorized():
+                await refresh_groups(tenant)
+        except Exception as e:
+            logger.error(f"[{tenant.name}] Error refreshing groups: {e}")
+        await asyncio.sleep(Config.GROUP_REFRESH_INTERVAL)
 
-async def mailing_loop():
+async def mailing_loop(tenant):
     """Main mailing loop that runs automatically"""
-    global is_mailing_active
-    
-    while is_mailing_active:
+    while tenant.is_mailing_active:
         try:
-            if pending_message and groups:
+            groups = sendable_groups(tenant)
+            if tenant.pending_message and groups:
                 # Send to all groups
-                tasks = [send_to_group(group) for group in groups]
+                cycle_started = time.monotonic()
+                tasks = [send_to_group(tenant, group) for group in groups]
                 results = await asyncio.gather(*tasks, return_exceptions=True)
                 sent_count = sum(1 for result in results if result is True)
-                
+                tenant.stats.record_cycle(sent_count, cycle_started)
+
                 # Update statistics
-                bot_settings['repeat_count'] += 1
-                save_settings(bot_settings)
-                
-                logger.info(f"Auto-mailing sent: {sent_count}/{len(groups)} groups. Total sends: {bot_settings['repeat_count']}")
-            
+                tenant.bot_settings['repeat_count'] += 1
+                tenant.save_settings()
+
+                logger.info(f"[{tenant.name}] Auto-mailing sent: {sent_count}/{len(groups)} groups. Total sends: {tenant.bot_settings['repeat_count']}")
+
             # Wait for the delay
-            delay = bot_settings['delay_seconds']
+            delay = tenant.bot_settings['delay_seconds']
             minutes = delay // 60
             seconds = delay % 60
             delay_text = f"{minutes} хв {seconds} сек" if minutes > 0 else f"{delay} сек"
-            
-            logger.info(f"Waiting {delay_text} before next mailing...")
+
+            logger.info(f"[{tenant.name}] Waiting {delay_text} before next mailing...")
             await asyncio.sleep(delay)
-            
+
         except Exception as e:
-            logger.error(f"Error in mailing loop: {e}")
+            logger.error(f"[{tenant.name}] Error in mailing loop: {e}")
             await asyncio.sleep(10)  # Wait 10 seconds before retrying
 
 # Mailing control buttons
-@dp.message(F.text.in_(["🟢 Запустити розсилку", "🔴 Зупинити розсилку"]))
-async def toggle_mailing(message: types.Message):
-    global is_mailing_active, mailing_task
-    
+async def toggle_mailing(message: types.Message, tenant: Tenant):
     if message.text == "🟢 Запустити розсилку":
-        if not pending_message:
-            await message.answer("❌ Спочатку створіть повідомлення через '✏️ Створити повідомлення'.", reply_markup=get_main_keyboard())
+        if not tenant.pending_message:
+            await message.answer("❌ Спочатку створіть повідомлення через '✏️ Створити повідомлення'.", reply_markup=get_main_keyboard(tenant))
             return
-        
-        if not groups:
-            await message.answer("❌ Групи не додані. Спочатку додайте групи.", reply_markup=get_main_keyboard())
+
+        if not tenant.groups:
+            await message.answer("❌ Групи не додані. Спочатку додайте групи.", reply_markup=get_main_keyboard(tenant))
+            return
+
+        if not sendable_groups(tenant):
+            await message.answer("🚫 У всіх групах немає права писати. Перевірте список через '📋 Переглянути групи'.", reply_markup=get_main_keyboard(tenant))
             return
-        
-        is_mailing_active = True
+
+        tenant.is_mailing_active = True
         # Start mailing loop
-        mailing_task = asyncio.create_task(mailing_loop())
-        
-        delay = bot_settings['delay_seconds']
+        tenant.mailing_task = asyncio.create_task(mailing_loop(tenant))
+
+        delay = tenant.bot_settings['delay_seconds']
         minutes = delay // 60
         seconds = delay % 60
         delay_text = f"{minutes} хв {seconds} сек" if minutes > 0 else f"{delay} сек"
-        
-        await message.answer(f"🟢 **Авто-розсилка запущена!**\n\n• Затримка: {delay_text}\n• Груп: {len(groups)}\n• Повідомлення буде відправлятись автоматично до зупинки.\n\nНатисніть '🔴 Зупинити розсилку' для зупинки.", reply_markup=get_main_keyboard())
-        
+
+        await message.answer(f"🟢 **Авто-розсилка запущена!**\n\n• Затримка: {delay_text}\n• Груп: {len(sendable_groups(tenant))}\n• Повідомлення буде відправлятись автоматично до зупинки.\n\nНатисніть '🔴 Зупинити розсилку' для зупинки.", reply_markup=get_main_keyboard(tenant))
+
     else:
-        is_mailing_active = False
-        if mailing_task:
-            mailing_task.cancel()
-            mailing_task = None
-        
-        await message.answer("🔴 **Розсилка зупинена!**\n\nВсього відправок: " + str(bot_settings['repeat_count']), reply_markup=get_main_keyboard())
+        tenant.is_mailing_active = False
+        if tenant.mailing_task:
+            tenant.mailing_task.cancel()
+            tenant.mailing_task = None
+
+        await message.answer("🔴 **Розсилка зупинена!**\n\nВсього відправок: " + str(tenant.bot_settings['repeat_count']), reply_markup=get_main_keyboard(tenant))
 
 # Cancel handler for all states
-@dp.message(F.text == "❌ Скасувати")
-async def cancel_handler(message: types.Message, state: FSMContext):
+async def cancel_handler(message: types.Message, state: FSMContext, tenant: Tenant):
     current_state = await state.get_state()
     if current_state is not None:
         await state.clear()
-    await message.answer("❌ Скасовано.", reply_markup=get_main_keyboard())
+    await message.answer("❌ Скасовано.", reply_markup=get_main_keyboard(tenant))
 
-@dp.message(F.text == "📊 Статистика")
-async def show_statistics(message: types.Message):
-    total_groups = len(groups)
-    mailing_status = "Активна" if is_mailing_active else "Зупинена"
-    delay = bot_settings['delay_seconds']
+async def show_statistics(message: types.Message, tenant: Tenant):
+    pending_message = tenant.pending_message
+    total_groups = len(tenant.groups)
+    mailing_status = "Активна" if tenant.is_mailing_active else "Зупинена"
+    delay = tenant.bot_settings['delay_seconds']
     minutes = delay // 60
     seconds = delay % 60
     delay_text = f"{minutes} хв {seconds} сек" if minutes > 0 else f"{delay} сек"
-    
+
     stats_text = (
         f"📊 **Статистика бота**\n\n"
         f"• Всього груп: `{total_groups}`\n"
         f"• Затримка: `{delay_text}`\n"
         f"• Статус розсилки: `{mailing_status}`\n"
-        f"• Всього відправок: `{bot_settings['repeat_count']}`\n"
+        f"• Всього відправок: `{tenant.bot_settings['repeat_count']}`\n"
         f"• Тип повідомлення: `{'Текст' if pending_message and pending_message['message_type'] == 'text' else 'Фото' if pending_message else 'Не створено'}`"
     )
-    
+    stats_text += format_group_stats(tenant)
+
     await message.answer(stats_text, parse_mode='Markdown')
 
-@dp.message(F.text == "❓ Допомога")
-async def show_help(message: types.Message):
+def escape_markdown(text):
+    """Экранирует спецсимволы legacy Markdown (_ * ` [)"""
+    return re.sub(r'([_*`\[])', r'\\\1', str(text))
+
+def format_group_stats(tenant):
+    """Самые медленные / ненадежные группы и тренд пропускной способности"""
+    stats = tenant.stats
+    titles = {g['id']: escape_markdown(g['title']) for g in tenant.groups}
+    text = ""
+
+    slowest = stats.slowest()
+    if slowest:
+        text += "\n\n🐢 **Найповільніші групи:**\n"
+        for group_id, s in slowest:
+            text += f"• {titles.get(group_id, group_id)}: p50 `{s.p50:.2f}с`, p95 `{s.p95:.2f}с`\n"
+
+    least_reliable = stats.least_reliable()
+    if least_reliable:
+        text += "\n⚠️ **Найменш надійні групи:**\n"
+        for group_id, s in least_reliable:
+            text += f"• {titles.get(group_id, group_id)}: успіх `{s.success_rate:.0%}`\n"
+            if s.last_error:
+                last_error = s.last_error[:100].replace('`', "'")
+                text += f"   Остання помилка: `{last_error}`\n"
+
+    trend = stats.cycle_throughput.values()
+    if trend:
+        text += "\n📈 **Швидкість по циклах (груп/с):**\n"
+        text += "`" + " → ".join(f"{value:.1f}" for value in trend[-10:]) + "`"
+
+    return text
+
+async def show_help(message: types.Message, tenant: Tenant):
     help_text = """
 ❓ **Довідка - Авто-розсилка**
 
@@ -659,29 +883,51 @@ async def show_help(message: types.Message):
 • Затримка працює між кожним циклом розсилки
 • Бот повинен бути запущений на комп'ютері
     """
-    await message.answer(help_text, reply_markup=get_main_keyboard())
+    await message.answer(help_text, reply_markup=get_main_keyboard(tenant))
+
+def register_handlers(dp):
+    """Регистрирует хендлеры на диспетчере tenant-а (порядок важен)"""
+    dp.message.register(start_command, Command("start"))
+    dp.message.register(view_groups, F.text == "📋 Переглянути групи")
+    dp.message.register(add_group_start, F.text == "➕ Додати групу")
+    dp.message.register(add_group_process, BotStates.waiting_for_group)
+    dp.message.register(remove_group_start, F.text == "🗑 Видалити групу")
+    dp.message.register(remove_group_action, F.text.startswith("🗑 "))
+    dp.message.register(change_delay_start, F.text == "⏰ Затримка")
+    dp.message.register(change_delay_process, BotStates.waiting_for_delay)
+    dp.message.register(compose_message_start, F.text == "✏️ Створити повідомлення")
+    dp.message.register(compose_text_process, BotStates.waiting_for_message, F.text)
+    dp.message.register(compose_photo_process, BotStates.waiting_for_message, F.photo)
+    dp.message.register(add_tags_start, F.text == "✅ Додати теги")
+    dp.message.register(add_tags_process, BotStates.waiting_for_tag_user)
+    dp.message.register(send_once_handler, F.text == "📤 Надіслати 1 раз")
+    dp.message.register(auto_repeat_handler, F.text == "🔄 Авто-повтор")
+    dp.message.register(toggle_mailing, F.text.in_(["🟢 Запустити розсилку", "🔴 Зупинити розсилку"]))
+    dp.message.register(cancel_handler, F.text == "❌ Скасувати")
+    dp.message.register(show_statistics, F.text == "📊 Статистика")
+    dp.message.register(show_help, F.text == "❓ Допомога")
+
+async def start_tenant(tenant):
+    """Подготовка одного tenant-а: файлы, webhook, Telethon клиент"""
+    print(f"\n👤 TENANT: {tenant.name}")
 
-async def main():
-    print("\n" + "="*50)
-    print("🚀 STARTING BOT ON RENDER")
-    print("="*50)
-    
     # Загружаем данные
-    if not os.path.exists(GROUPS_FILE):
-        save_groups(groups)
-    if not os.path.exists(SETTINGS_FILE):
-        save_settings(bot_settings)
-    
+    if not os.path.exists(tenant.config.GROUPS_FILE):
+        tenant.save_groups()
+    if not os.path.exists(tenant.config.SETTINGS_FILE):
+        tenant.save_settings()
+
     # ОЧЕНЬ ВАЖНО: сначала останавливаем любые старые сессии
     print("🔄 Stopping any existing bot sessions...")
     try:
-        await bot.delete_webhook(drop_pending_updates=True)
+        await tenant.bot.delete_webhook(drop_pending_updates=True)
         print("✅ Old webhook deleted")
     except Exception as e:
         print(f"ℹ️ Error deleting webhook: {e}")
-    
+
     # Проверяем авторизацию Telethon
     print("\n🔐 CHECKING TELETHON AUTHORIZATION")
+    client = tenant.client
     try:
         if await client.is_user_authorized():
             me = await client.get_me()
@@ -691,10 +937,10 @@ async def main():
             print("⚠️ User client will not be able to send messages!")
     except Exception as e:
         print(f"⚠️ Error checking Telethon authorization: {e}")
-    
+
     # Даем время Telegram обновить состояние
     await asyncio.sleep(2)
-    
+
     # Запускаем user client
     print("\n🔌 STARTING USER CLIENT...")
     try:
@@ -708,12 +954,111 @@ async def main():
     except Exception as e:
         print(f"❌ Failed to start user client: {e}")
         print("⚠️ Continuing without user client - messages won't send!")
-    
-    # Запускаем бота
-    print("\n🤖 STARTING TELEGRAM BOT...")
+
+async def main():
+    print("\n" + "="*50)
+    print("🚀 STARTING BOT ON RENDER")
+    print("="*50)
+
+    # Только один экземпляр может поллить и рассылать (overlapping deploys)
+    lease = Lease(Config.LEASE_FILE, Config.LEASE_TTL)
+    print(f"🔒 Waiting for lease as {lease.holder}...")
+    await lease.acquire(Config.LEASE_HEARTBEAT)
+    print("✅ Lease acquired - this instance is active")
+
+    # Heartbeat стартует до настройки tenant-ов: их запуск может быть дольше TTL
+    heartbeat = asyncio.create_task(lease.keep_alive(Config.LEASE_HEARTBEAT))
+    runner = asyncio.create_task(run_tenants())
+
+    # Render останавливает старый экземпляр через SIGTERM - освобождаем аренду сразу
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, runner.cancel)
+        except NotImplementedError:  # Windows
+            pass
+
+    try:
+        await asyncio.wait([runner, heartbeat], return_when=asyncio.FIRST_COMPLETED)
+        if heartbeat.done():
+            # Аренду забрал другой экземпляр - прекращаем поллинг и рассылку
+            print("⚠️ Lease lost - stopping polling and mailing")
+            runner.cancel()
+        await asyncio.wait([runner])
+
+        # Ошибка запуска (например, битый tenants.json) не должна теряться
+        if not runner.cancelled() and runner.exception() is not None:
+            logger.exception("Bot stopped with an error", exc_info=runner.exception())
+            raise runner.exception()
+    finally:
+        heartbeat.cancel()
+        lease.release()
+        print("🔓 Lease released")
+
+async def run_tenants():
+    # Один процесс - много пар бот/аккаунт на одном event loop
+    if os.path.exists(Config.TENANTS_FILE):
+        tenant_configs = load_tenant_configs()
+    else:
+        session_path = find_session_file()
+        print(f"📁 Using session path: {session_path}")
+        print("=" * 50)
+        tenant_configs = load_tenant_configs(session_path)
+
+    # Ошибка в настройках одного tenant-а не должна останавливать остальных
+    tenants = []
+    for config in tenant_configs:
+        try:
+            tenants.append(create_app(config))
+        except Exception as e:
+            logger.error(f"[{config.name}] Skipping tenant, cannot create app: {e}")
+    print(f"👥 Tenants: {len(tenants)}/{len(tenant_configs)}")
+
+    if not tenants:
+        print("❌ No valid tenants - nothing to run")
+        return
+
+    # Запускаем ботов: каждый tenant - отдельная задача
+    print("\n🤖 STARTING TELEGRAM BOTS...")
     print("🚀 Starting bot polling...")
-    await dp.start_polling(bot, skip_updates=True, allowed_updates=[])
+    tenant_tasks = [asyncio.create_task(run_tenant(tenant)) for tenant in tenants]
     print("✅ Bot started polling - Auto-mailing READY!")
 
+    try:
+        # asyncio.wait не отменяет задачи сам - отмена ровно одна, в finally,
+        # чтобы не прервать disconnect внутри stop_tenant
+        await asyncio.wait(tenant_tasks)
+    finally:
+        # Остановка (сигнал или потеря аренды): дожидаемся закрытия всех tenant-ов
+        for task in tenant_tasks:
+            task.cancel()
+        await asyncio.gather(*tenant_tasks, return_exceptions=True)
+
+async def run_tenant(tenant):
+    """Запуск и поллинг одного tenant-а; его ошибки не затрагивают остальных"""
+    try:
+        await start_tenant(tenant)
+        tenant.refresh_task = asyncio.create_task(refresh_groups_loop(tenant))
+        await tenant.dp.start_polling(tenant.bot, skip_updates=True, allowed_updates=[], handle_signals=False)
+    except Exception as e:
+        logger.error(f"[{tenant.name}] Tenant stopped: {e}")
+    finally:
+        await stop_tenant(tenant)
+
+async def stop_tenant(tenant):
+    """Останавливает рассылку и фоновые задачи, корректно отключает Telethon"""
+    tenant.is_mailing_active = False
+    tasks = [task for task in (tenant.mailing_task, tenant.refresh_task) if task]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    tenant.mailing_task = None
+    tenant.refresh_task = None
+
+    try:
+        await tenant.client.disconnect()
+    except Exception as e:
+        logger.error(f"[{tenant.name}] Error disconnecting user client: {e}")
+
 if __name__ == '__main__':
     asyncio.run(main())
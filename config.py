@@ -1,18 +1,108 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class Config:
-    API_ID = int(os.getenv('API_ID'))
+    API_ID = int(os.getenv('API_ID', 0))
     API_HASH = os.getenv('API_HASH')
     BOT_TOKEN = os.getenv('BOT_TOKEN')
     CHANNEL_USERNAME = os.getenv('CHANNEL_USERNAME')
-    ADMIN_ID = int(os.getenv('ADMIN_ID'))
+    ADMIN_ID = int(os.getenv('ADMIN_ID', 0))
     DELAY_SECONDS = int(os.getenv('DELAY_SECONDS', 5))
-    
+    # Минимальный интервал между редактированиями сообщения о прогрессе
+    PROGRESS_EDIT_INTERVAL = float(os.getenv('PROGRESS_EDIT_INTERVAL', 3))
+    # Фоновое обновление метаданных групп: период (сек), размер пачки, пауза между пачками
+    GROUP_REFRESH_INTERVAL = int(os.getenv('GROUP_REFRESH_INTERVAL', 3600))
+    GROUP_REFRESH_BATCH = int(os.getenv('GROUP_REFRESH_BATCH', 20))
+    GROUP_REFRESH_PAUSE = float(os.getenv('GROUP_REFRESH_PAUSE', 2))
+    # Аренда активного экземпляра: срок (сек) и период heartbeat/проверки standby
+    LEASE_TTL = int(os.getenv('LEASE_TTL', 15))
+    LEASE_HEARTBEAT = int(os.getenv('LEASE_HEARTBEAT', 5))
+
     # Storage files
     LOG_FILE = 'forwarded_messages.log'
     GROUPS_FILE = 'groups.json'
+    SETTINGS_FILE = 'bot_settings.json'
+    LEASE_FILE = os.getenv('LEASE_FILE', 'bot_lease.json')
 
     SCHEDULE_FILE = 'schedule.json'
+
+    # Multi-tenant: список пар бот/акаунт, що працюють в одному процесі
+    TENANTS_FILE = os.getenv('TENANTS_FILE', 'tenants.json')
+
+
+class TenantConfig:
+    """Настройки одной пары бот/аккаунт (tenant)"""
+
+    def __init__(self, name, api_id, api_hash, bot_token, admin_id,
+                 session=None, groups_file=None, settings_file=None):
+        self.name = name
+        self.API_ID = int(api_id)
+        self.API_HASH = api_hash
+        self.BOT_TOKEN = bot_token
+        self.ADMIN_ID = int(admin_id)
+        self.SESSION = session or f"{name}_session"
+        self.GROUPS_FILE = groups_file or f"groups_{name}.json"
+        self.SETTINGS_FILE = settings_file or f"bot_settings_{name}.json"
+
+
+def _tenant_keys(config):
+    """Имя и пути файлов tenant-а, которые не должны совпадать с другими"""
+    session = config.SESSION
+    if session.endswith('.session'):
+        session = session[:-len('.session')]
+    return {
+        ('name', config.name),
+        ('session', os.path.abspath(session)),
+        ('groups_file', os.path.abspath(config.GROUPS_FILE)),
+        ('settings_file', os.path.abspath(config.SETTINGS_FILE)),
+    }
+
+
+def load_tenant_configs(session_path=None):
+    """
+    Загружает список tenant-ов из TENANTS_FILE.
+
+    Формат файла - JSON список объектов с ключами name, api_id, api_hash,
+    bot_token, admin_id и необязательными session, groups_file, settings_file.
+    Некорректные записи и записи, повторяющие name, session, groups_file
+    или settings_file предыдущих, пропускаются с сообщением в лог.
+    Если файла нет - возвращает один tenant из переменных окружения,
+    со старыми именами файлов (groups.json, bot_settings.json).
+    """
+    if os.path.exists(Config.TENANTS_FILE):
+        with open(Config.TENANTS_FILE, 'r') as f:
+            entries = json.load(f)
+
+        # Некорректная запись пропускается, остальные tenant-ы запускаются
+        configs = []
+        used = set()
+        for index, entry in enumerate(entries):
+            try:
+                config = TenantConfig(**entry)
+            except (TypeError, ValueError) as e:
+                print(f"❌ Skipping tenant #{index} ({entry.get('name') if isinstance(entry, dict) else entry}): {e}")
+                continue
+
+            # Общие сессия или файлы сломали бы изоляцию tenant-ов
+            keys = _tenant_keys(config)
+            duplicates = keys & used
+            if duplicates:
+                print(f"❌ Skipping tenant #{index} ({config.name}): duplicate {', '.join(sorted(kind for kind, _ in duplicates))}")
+                continue
+            used |= keys
+            configs.append(config)
+        return configs
+
+    return [TenantConfig(
+        name='default',
+        api_id=Config.API_ID,
+        api_hash=Config.API_HASH,
+        bot_token=Config.BOT_TOKEN,
+        admin_id=Config.ADMIN_ID,
+        session=session_path or 'user_session',
+        groups_file=Config.GROUPS_FILE,
+        settings_file=Config.SETTINGS_FILE,
+    )]
@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import logging
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: остается только атомарная запись файла
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class Lease:
+    """
+    Аренда "единственного активного экземпляра" в локальном файле.
+
+    В файле лежит запись {holder, heartbeat_at, expires_at}. Держатель
+    продлевает ее каждые несколько секунд; если запись истекла, ее может
+    забрать любой другой процесс, работающий с тем же хранилищем.
+    """
+
+    def __init__(self, path, ttl, holder=None):
+        self.path = path
+        self.ttl = ttl
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, data):
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.path)
+
+    def try_acquire(self):
+        """Берет или продлевает аренду. True, если мы - держатель"""
+        with self._locked():
+            now = time.time()
+            current = self._read()
+            if current and current.get('holder') != self.holder and current.get('expires_at', 0) > now:
+                return False
+            self._write({'holder': self.holder, 'heartbeat_at': now, 'expires_at': now + self.ttl})
+            return True
+
+    def release(self):
+        with self._locked():
+            current = self._read()
+            if current and current.get('holder') == self.holder:
+                os.remove(self.path)
+
+    async def acquire(self, interval):
+        """Ждет в режиме standby, пока аренда не освободится"""
+        waiting_logged = False
+        while not self.try_acquire():
+            if not waiting_logged:
+                current = self._read() or {}
+                logger.info(f"Lease held by {current.get('holder')}, waiting as standby...")
+                waiting_logged = True
+            await asyncio.sleep(interval)
+        logger.info(f"Lease acquired by {self.holder}")
+
+    async def keep_alive(self, interval):
+        """Heartbeat. Возвращается, когда аренду потеряли"""
+        last_renewed = time.time()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not self.try_acquire():
+                    logger.error(f"Lease lost by {self.holder}")
+                    return
+                last_renewed = time.time()
+            except OSError as e:
+                logger.error(f"Lease heartbeat failed: {e}")
+                # Не смогли продлить до истечения - считаем аренду потерянной
+                if time.time() - last_renewed >= self.ttl:
+                    return
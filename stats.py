@@ -0,0 +1,102 @@
+import time
+from array import array
+
+# Размер кольцевых буферов
+GROUP_WINDOW = 50
+CYCLE_WINDOW = 20
+
+
+class RingBuffer:
+    """Кольцевой буфер фиксированного размера на основе array"""
+
+    def __init__(self, typecode, size):
+        self.data = array(typecode, [0] * size)
+        self.size = size
+        self.pos = 0
+        self.count = 0
+
+    def append(self, value):
+        self.data[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def values(self):
+        """Значения от самого старого к самому новому"""
+        if self.count < self.size:
+            return list(self.data[:self.count])
+        return list(self.data[self.pos:]) + list(self.data[:self.pos])
+
+    def __len__(self):
+        return self.count
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class GroupStats:
+    """Последние отправки в одну группу: задержка и результат"""
+
+    def __init__(self, size=GROUP_WINDOW):
+        self.latency = RingBuffer('f', size)
+        self.success = RingBuffer('b', size)
+        self.last_error = None
+
+    def record(self, latency, ok, error=None):
+        self.latency.append(latency)
+        self.success.append(1 if ok else 0)
+        if error is not None:
+            self.last_error = error
+
+    @property
+    def p50(self):
+        return percentile(self.latency.values(), 50)
+
+    @property
+    def p95(self):
+        return percentile(self.latency.values(), 95)
+
+    @property
+    def success_rate(self):
+        outcomes = self.success.values()
+        if not outcomes:
+            return 1.0
+        return sum(outcomes) / len(outcomes)
+
+
+class MailingStats:
+    """Статистика рассылки одного tenant-а: по группам и по циклам"""
+
+    def __init__(self):
+        self.groups = {}
+        self.cycle_throughput = RingBuffer('f', CYCLE_WINDOW)
+
+    def group(self, group_id):
+        if group_id not in self.groups:
+            self.groups[group_id] = GroupStats()
+        return self.groups[group_id]
+
+    def record_send(self, group_id, started, ok, error=None):
+        self.group(group_id).record(time.monotonic() - started, ok, error)
+
+    def record_cycle(self, sent_count, started):
+        elapsed = max(time.monotonic() - started, 0.001)
+        self.cycle_throughput.append(sent_count / elapsed)
+
+    def forget(self, active_ids):
+        """Удаляет статистику групп, которых больше нет в списке"""
+        for group_id in list(self.groups):
+            if group_id not in active_ids:
+                del self.groups[group_id]
+
+    def slowest(self, limit=3):
+        measured = [(gid, s) for gid, s in self.groups.items() if len(s.latency)]
+        return sorted(measured, key=lambda item: item[1].p95, reverse=True)[:limit]
+
+    def least_reliable(self, limit=3):
+        failing = [(gid, s) for gid, s in self.groups.items() if s.success_rate < 1.0]
+        return sorted(failing, key=lambda item: item[1].success_rate)[:limit]